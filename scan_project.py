@@ -5,145 +5,488 @@ Nuevos filtros:
   --discard-files-in  carpetas donde solo se indexan sub-carpetas
   --discard-all-in    carpetas que se saltan por completo
   --discard-files     archivos específicos a ignorar globalmente
-pip install typer rich pydantic
+pip install typer rich orjson
 """
-import json
+import errno
+import os
+import stat
 import sys
+from collections import ChainMap
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, Optional, Set
+from typing import (
+    BinaryIO, Dict, FrozenSet, Iterable, Iterator, List, MutableMapping, Optional, Tuple,
+    TypedDict,
+)
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import orjson
 import typer
-from pydantic import BaseModel, Field
 from rich.console import Console
+from rich.text import Text
 from rich.tree import Tree
 from io import StringIO
 
 app = typer.Typer()
 console = Console()
 
-DEFAULT_IGNORE = {
+DEFAULT_IGNORE = frozenset({
     "node_modules", ".git", "__pycache__", ".venv", "venv",
     ".next", "dist", "build", ".nuxt", ".pytest_cache", ".mypy_cache"
-}
+})
+
+# Recorrer con fd por carpeta (open/scandir relativos a dir_fd) solo es posible en Unix
+_HAS_DIR_FD = os.open in os.supports_dir_fd and os.scandir in os.supports_fd
+_DIR_OPEN_FLAGS = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) | getattr(os, "O_NOFOLLOW", 0)
+# Cada hilo mantiene como mucho un fd abierto por nivel hasta esta profundidad;
+# más abajo se sigue por rutas, que no acumula fds
+_MAX_FD_DEPTH = 32
+_FD_EXHAUSTED = (errno.EMFILE, errno.ENFILE)
+
+
+def _max_workers() -> int:
+    # El recorrido es de E/S: se usan más hilos que núcleos...
+    workers = (os.cpu_count() or 1) * 4
+    if resource is None or not _HAS_DIR_FD:
+        return workers
+    # ...pero sin que los fds que puede tener abiertos cada hilo (uno por
+    # nivel, más el de scandir y el de package.json) pasen del límite.
+    soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft_limit == resource.RLIM_INFINITY:
+        return workers
+    return max(1, min(workers, (soft_limit - 64) // (_MAX_FD_DEPTH + 2)))
+
+
+MAX_WORKERS = _max_workers()
+# Solo se reparten entre hilos las carpetas con más sub-carpetas que esto
+FAN_OUT_MIN_SUBDIRS = 4
+# Solo en Windows hace falta pasar las rutas relativas a "/"
+_BACKSLASH_SEP = os.sep == "\\"
+# Campos de package.json que se copian al nodo del archivo
+PACKAGE_JSON_KEYS = ("scripts", "dependencies", "devDependencies")
 
 
 # ---------- modelos ----------
-class PackageJson(BaseModel):
-    scripts: Dict[str, str] = Field(default_factory=dict)
-    dependencies: Dict[str, str] = Field(default_factory=dict)
-    devDependencies: Dict[str, str] = Field(default_factory=dict)
+# Los nodos son dicts con la forma exacta del JSON: se construyen con un
+# literal y se serializan tal cual, sin instancias intermedias.
+class _FileNodeBase(TypedDict):
+    type: str           # "file"
+    path: str
+    descripcion: str
 
 
-class FileNode(BaseModel):
-    type: str = "file"
-    path: str
-    descripcion: str = ""
-    scripts: Optional[Dict[str, str]] = None
-    dependencies: Optional[Dict[str, str]] = None
-    devDependencies: Optional[Dict[str, str]] = None
+class FileNode(_FileNodeBase, total=False):
+    # Solo en package.json, y solo las secciones que existen (no hay nulls)
+    scripts: Dict[str, str]
+    dependencies: Dict[str, str]
+    devDependencies: Dict[str, str]
 
 
-class DirNode(BaseModel):
-    type: str = "directory"
+class DirNode(TypedDict):
+    type: str           # "directory"
     path: str
-    descripcion: str = ""
-    children: Dict[str, "Node"] = Field(default_factory=dict)
+    descripcion: str
+    children: Dict[str, "Node"]
 
 
 Node = FileNode | DirNode   # 3.10+ syntax
 
+# Ruta absoluta de cada package.json -> [st_mtime_ns, st_size, info extraída]
+PackageCache = MutableMapping[str, list]
+
 
 # ---------- helpers ----------
-def _read_list_option(value: Optional[str]) -> Set[str]:
+def _interned_set(values: Iterable[str]) -> FrozenSet[str]:
+    """frozenset de cadenas internadas para las búsquedas del bucle interno."""
+    return frozenset(sys.intern(v) for v in values)
+
+
+def _read_list_option(value: Optional[str]) -> FrozenSet[str]:
     """Convierte string separado por comas o saltos de línea en conjunto."""
     if not value:
-        return set()
+        return frozenset()
     parts = [p.strip() for p in value.replace(",", "\n").splitlines() if p.strip()]
-    return set(parts)
+    return _interned_set(parts)
 
 
-def extract_package_json_info(file_path: Path) -> dict:
+def _load_package_cache(cache_path: Optional[Path]) -> Dict[str, list]:
+    """Lee la caché de package.json de una ejecución anterior (si existe)."""
+    if cache_path is None or not cache_path.exists():
+        return {}
     try:
-        data = json.loads(file_path.read_text(encoding="utf-8"))
-        pkg = PackageJson.model_validate(data)
-        return pkg.model_dump(exclude_none=True)
+        cache = orjson.loads(cache_path.read_bytes())
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, orjson.JSONDecodeError) as e:
+        console.print(f"[yellow]⚠️  Caché inválida en {cache_path}, se ignora: {e}[/yellow]")
+        return {}
+
+
+def _save_package_cache(cache_path: Path, cache: Dict[str, list]) -> None:
+    try:
+        cache_path.write_bytes(orjson.dumps(cache))
+    except OSError as e:
+        console.print(f"[yellow]⚠️  No se pudo guardar la caché en {cache_path}: {e}[/yellow]")
+
+
+def _cache_entry_matches(cached: object, st: os.stat_result) -> bool:
+    """La entrada tiene la forma [mtime_ns, size, info] y coincide con el stat."""
+    return (
+        isinstance(cached, list) and len(cached) == 3
+        and cached[0] == st.st_mtime_ns and cached[1] == st.st_size
+        and isinstance(cached[2], dict)
+    )
+
+
+def _read_package_json(file_path: Path, dir_fd: Optional[int] = None) -> dict:
+    if dir_fd is None:
+        raw = file_path.read_bytes()
+    else:
+        with open(os.open(file_path.name, os.O_RDONLY, dir_fd=dir_fd), "rb") as fh:
+            raw = fh.read()
+    data = orjson.loads(raw)
+    return {k: data[k] for k in PACKAGE_JSON_KEYS if data.get(k)}
+
+
+def extract_package_json_info(
+    file_path: Path,
+    cache: Optional[PackageCache] = None,
+    dir_fd: Optional[int] = None,
+) -> dict:
+    """Extrae scripts y dependencias; con caché, solo relee si cambió mtime o tamaño.
+
+    Con dir_fd (el fd de la carpeta que da _walk) el stat y la lectura se
+    resuelven relativos a ese fd, sin recorrer la ruta desde la raíz.
+    """
+    try:
+        st = os.stat(file_path if dir_fd is None else file_path.name, dir_fd=dir_fd)
+        # os.walk lista FIFOs, sockets, etc. como archivos: leer un FIFO
+        # llamado package.json bloquearía el escaneo para siempre.
+        if not stat.S_ISREG(st.st_mode):
+            return {}
+        if cache is None:
+            return _read_package_json(file_path, dir_fd)
+
+        key = str(file_path)
+        cached = cache.get(key)
+        if _cache_entry_matches(cached, st):
+            # Con un ChainMap esto la copia a la caché de esta ejecución
+            cache[key] = cached
+            return cached[2]
+        info = _read_package_json(file_path, dir_fd)
+        cache[key] = [st.st_mtime_ns, st.st_size, info]
+        return info
     except Exception as e:
         console.print(f"[yellow]⚠️  No se pudo leer {file_path}: {e}[/yellow]")
         return {}
 
 
 def _fill_rich_tree(node: DirNode, parent: Tree):
-    for name, child in node.children.items():
-        if isinstance(child, DirNode):
-            branch = parent.add(f"[bold cyan]{name}/")
+    # Etiquetas Text en lugar de markup: Rich no tiene que tokenizar cada
+    # nombre (y un "[" en un nombre ya no se interpreta como estilo).
+    parent_add = parent.add
+    for name, child in node["children"].items():
+        if child["type"] == "directory":
+            branch = parent_add(Text(f"{name}/", style="bold cyan"))
             _fill_rich_tree(child, branch)
         else:
-            parent.add(f"[green]{name}[/green]")
+            parent_add(Text(name, style="green"))
+
+
+def build_rich_tree(root_node: DirNode, root_name: str) -> Tree:
+    """Árbol Rich con estilos, compartido por --pretty y --tree-md."""
+    tree = Tree(Text(f"{root_name}/", style="bold bright_white"))
+    _fill_rich_tree(root_node, tree)
+    return tree
 
 
-def render_tree_plain(root_node: DirNode, root_name: str) -> str:
+def render_tree_plain(tree: Tree, root_name: str) -> str:
+    """Renderiza el árbol sin color; los estilos se descartan al imprimir."""
     buffer = StringIO()
     cons = Console(file=buffer, color_system=None, width=240)
-    tree = Tree(root_name)
-    _fill_rich_tree(root_node, tree)
-    cons.print(tree)
+    label = tree.label
+    tree.label = Text(root_name)
+    try:
+        cons.print(tree)
+    finally:
+        tree.label = label
     return buffer.getvalue()
 
 
 # ---------- árbol ----------
-def build_tree(
-    current: Path,
-    root: Path,
-    ignore: Set[str],
-    discard_files_in: Set[str],
-    discard_all_in: Set[str],
-    discard_files: Set[str],
-    rich_parent: Tree
-) -> DirNode:
-    relative = current.relative_to(root)
-    relative_str = str(relative).replace("\\", "/")
-    node = DirNode(path=relative_str)
+def _warn_walk_error(error: OSError, path: Optional[str] = None) -> None:
+    console.print(f"[yellow]⚠️  No se pudo leer {path or error.filename}: {error}[/yellow]")
 
-    # Si esta carpeta está en "descartar todo", devolvemos nodo vacío y listo
-    if relative_str in discard_all_in:
-        return node
 
-    items = sorted(current.iterdir(), key=lambda p: (p.is_file(), p.name.lower()))  # carpetas primero
+def _walk(top: str) -> Iterator[Tuple[str, List[str], List[str], Optional[int]]]:
+    """Como os.walk(topdown=True, followlinks=False), pero da también el fd de cada carpeta.
 
-    for item in items:
-        name = item.name
-        if name in ignore:
-            continue
+    Con dir_fd (Unix) cada carpeta se abre relativa al fd de la de arriba y
+    el kernel no vuelve a resolver la ruta completa en cada stat/open. Donde
+    no hay dir_fd se usa os.walk con fd None. Igual que en os.walk, podar
+    dirnames en sitio evita bajar a esas carpetas.
+    """
+    if not _HAS_DIR_FD:
+        yield from _walk_paths(top)
+        return
+    try:
+        top_fd = os.open(top, _DIR_OPEN_FLAGS)
+    except OSError as e:
+        if e.errno in _FD_EXHAUSTED:
+            yield from _walk_paths(top)
+        else:
+            _warn_walk_error(e, top)
+        return
+    try:
+        yield from _walk_fds(top, top_fd, 1)
+    finally:
+        os.close(top_fd)
+
+
+def _walk_paths(top: str) -> Iterator[Tuple[str, List[str], List[str], Optional[int]]]:
+    for dirpath, dirnames, filenames in os.walk(
+        top, topdown=True, onerror=_warn_walk_error, followlinks=False
+    ):
+        yield dirpath, dirnames, filenames, None
+
+
+def _walk_fds(
+    dirpath: str, fd: int, depth: int
+) -> Iterator[Tuple[str, List[str], List[str], Optional[int]]]:
+    """Recorre dirpath (ya abierta como fd) con un fd abierto por nivel.
+
+    Los errores se avisan con la ruta completa. Por debajo de _MAX_FD_DEPTH,
+    o si se agotan los fds (EMFILE/ENFILE), el sub-árbol sigue por rutas con
+    os.walk en lugar de quedar vacío.
+    """
+    dirnames: List[str] = []
+    filenames: List[str] = []
+    symlinks = set()
+    try:
+        with os.scandir(fd) as it:
+            for entry in it:
+                if entry.is_dir():
+                    dirnames.append(entry.name)
+                    if entry.is_symlink():
+                        symlinks.add(entry.name)
+                else:
+                    filenames.append(entry.name)
+    except OSError as e:
+        if e.errno in _FD_EXHAUSTED:
+            yield from _walk_paths(dirpath)
+        else:
+            _warn_walk_error(e, dirpath)
+        return
 
-        # Filtro global de archivos específicos
-        if item.is_file() and name in discard_files:
-            continue
+    yield dirpath, dirnames, filenames, fd
 
-        ruta_completa = str(item.relative_to(root)).replace("\\", "/")
+    for name in dirnames:
+        # Como os.walk(followlinks=False): el enlace se lista pero no se baja
+        if name in symlinks:
+            continue
+        child_path = os.path.join(dirpath, name)
+        if depth >= _MAX_FD_DEPTH:
+            yield from _walk_paths(child_path)
+            continue
+        try:
+            child_fd = os.open(name, _DIR_OPEN_FLAGS, dir_fd=fd)
+        except OSError as e:
+            if e.errno in _FD_EXHAUSTED:
+                yield from _walk_paths(child_path)
+            else:
+                _warn_walk_error(e, child_path)
+            continue
+        try:
+            yield from _walk_fds(child_path, child_fd, depth + 1)
+        finally:
+            os.close(child_fd)
+
+
+def _scan_dir(
+    node: DirNode,
+    current: str,
+    files_banned: bool,
+    root_len: int,
+    ignore: FrozenSet[str],
+    discard_files_in: Tuple[str, ...],
+    discard_all_in: FrozenSet[str],
+    discard_files: FrozenSet[str],
+    package_cache: PackageCache,
+) -> List[Tuple[DirNode, str, bool]]:
+    """Llena el sub-árbol de node y devuelve las sub-carpetas que se reparten.
+
+    El recorrido usa _walk (como os.walk, con fd por carpeta): lo ignorado y lo de "descartar
+    todo" se poda de dirnames antes de bajar, y las carpetas con más de
+    FAN_OUT_MIN_SUBDIRS sub-carpetas no se bajan aquí, se devuelven para
+    repartirlas entre hilos.
+
+    files_banned indica que la carpeta ya está dentro de un "discard-files-in":
+    se hereda hacia abajo para no volver a comparar prefijos en cada entrada.
+    """
+    # _walk sigue el enlace si la propia raíz lo es; solo puede pasar con
+    # carpetas repartidas, que se listaron en dirnames sin bajar a ellas.
+    if os.path.islink(current):
+        return []
+
+    # Búsquedas globales y de atributos resueltas una vez fuera del bucle
+    intern = sys.intern
+    join = os.path.join
+    basename = os.path.basename
+    lower = str.lower
+    backslash_sep = _BACKSLASH_SEP
+    fan_out_min = FAN_OUT_MIN_SUBDIRS
+
+    pending: List[Tuple[DirNode, str, bool]] = []
+    # Carpetas ya creadas en el árbol que os.walk todavía no ha visitado
+    open_dirs: Dict[str, Tuple[DirNode, bool]] = {current: (node, files_banned)}
+    for dirpath, dirnames, filenames, dir_fd in _walk(current):
+        node, files_banned = open_dirs.pop(dirpath)
+        children = node["children"]
+        prefix = dirpath[root_len:]
+        if backslash_sep:
+            prefix = prefix.replace("\\", "/")
+        if prefix:
+            prefix += "/"
+
+        # Carpetas primero, cada grupo por nombre sin distinguir mayúsculas
+        dirnames.sort(key=lower)
+        subdirs: List[Tuple[DirNode, str, bool]] = []
+        for name in dirnames:
+            if name in ignore:
+                continue
+            # Los nombres (index.ts, package.json, __init__.py...) se repiten
+            # en muchas carpetas: como claves internadas se guardan una vez.
+            name = intern(name)
+            ruta_completa = prefix + name
+            # El nodo se crea aquí para conservar el orden; se llena al visitarlo
+            child_node: DirNode = {
+                "type": "directory", "path": ruta_completa, "descripcion": "", "children": {},
+            }
+            children[name] = child_node
+            # "Descartar todo": queda el nodo vacío sin llegar a abrir la carpeta
+            if ruta_completa not in discard_all_in:
+                child_banned = files_banned or ruta_completa.startswith(discard_files_in)
+                subdirs.append((child_node, join(dirpath, name), child_banned))
+
+        # Con pocas sub-carpetas no compensa repartirlas: se recorren en este hilo
+        if len(subdirs) > fan_out_min:
+            pending.extend(subdirs)
+            dirnames[:] = []
+        else:
+            dirnames[:] = [basename(child_path) for _, child_path, _ in subdirs]
+            for child_node, child_path, child_banned in subdirs:
+                open_dirs[child_path] = (child_node, child_banned)
 
-        if item.is_dir():
-            # ¿Está dentro de alguna carpeta "discard-files-in"?
-            flag_discard_files = any(ruta_completa.startswith(df) for df in discard_files_in)
-            rich_dir = rich_parent.add(f"[bold cyan]{name}/")
-            child_node = build_tree(
-                item, root, ignore,
-                discard_files_in, discard_all_in, discard_files,
-                rich_dir
-            )
-            node.children[name] = child_node
-        elif item.is_file():
+        # Archivos: dentro de un "discard-files-in" no se mira ninguno
+        if files_banned:
+            continue
+        filenames.sort(key=lower)
+        for name in filenames:
+            if name in ignore or name in discard_files:
+                continue
+            ruta_completa = prefix + name
             # ¿Está dentro de alguna carpeta "discard-files-in"?
-            if any(ruta_completa.startswith(df) for df in discard_files_in):
+            if ruta_completa.startswith(discard_files_in):
                 continue
-            file_info = extract_package_json_info(item) if name == "package.json" else {}
-            file_node = FileNode(
-                path=ruta_completa,
-                descripcion="",
-                **file_info
+            name = intern(name)
+            file_node: FileNode = {"type": "file", "path": ruta_completa, "descripcion": ""}
+            if name == "package.json":
+                file_node.update(extract_package_json_info(
+                    Path(dirpath, name), package_cache, dir_fd
+                ))
+            children[name] = file_node
+    return pending
+
+
+def build_tree(
+    root: str,
+    ignore: FrozenSet[str],
+    discard_files_in: Tuple[str, ...],
+    discard_all_in: FrozenSet[str],
+    discard_files: FrozenSet[str],
+    package_cache: Optional[PackageCache] = None,
+    max_workers: int = MAX_WORKERS,
+) -> DirNode:
+    """Recorre el árbol repartiendo las sub-carpetas entre varios hilos.
+
+    scandir/stat liberan el GIL, así que el recorrido escala con los hilos.
+    Las tareas no esperan a sus hijas: devuelven las sub-carpetas pendientes
+    y este bucle las encola, de modo que el pool nunca se bloquea.
+    """
+    root_len = len(os.path.join(root, ""))
+    root_node: DirNode = {"type": "directory", "path": ".", "descripcion": "", "children": {}}
+    if package_cache is None:
+        package_cache = {}
+    args = (
+        root_len, ignore, discard_files_in, discard_all_in, discard_files,
+        package_cache,
+    )
+
+    # Si la raíz está en "descartar todo", devolvemos nodo vacío y listo
+    if root_node["path"] in discard_all_in:
+        return root_node
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_scan_dir, root_node, root, False, *args)}
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                for child_node, child_path, child_banned in future.result():
+                    futures.add(pool.submit(
+                        _scan_dir, child_node, child_path, child_banned, *args
+                    ))
+    return root_node
+
+
+# ---------- salida ----------
+def write_structure_json(fp: BinaryIO, structure: Dict[str, DirNode]) -> None:
+    """Escribe la estructura en fp con el formato de orjson.OPT_INDENT_2.
+
+    Se recorre el árbol con una pila y se escribe nodo a nodo, así el
+    documento completo nunca está en memoria (ni como str ni como bytes).
+    """
+    dumps = orjson.dumps
+    indent_2 = orjson.OPT_INDENT_2
+    write = fp.write
+
+    write(b"{")
+    # Cada marco es un dict de hijos: [iterador, nivel de sangría, ¿vacío aún?]
+    stack = [[iter(structure.items()), 0, True]]
+    while stack:
+        frame = stack[-1]
+        items, level, first = frame
+        entry = next(items, None)
+        if entry is None:
+            stack.pop()
+            write(b"}" if first else b"\n" + b"  " * level + b"}")
+            # Cerrar el dict de hijos cierra también el DirNode que lo contiene
+            if stack:
+                write(b"\n" + b"  " * (level - 1) + b"}")
+            continue
+
+        name, node = entry
+        frame[2] = False
+        pad = b"\n" + b"  " * (level + 1)
+        write((pad if first else b"," + pad) + dumps(name) + b": ")
+        if node["type"] == "directory":
+            field_pad = pad + b"  "
+            write(
+                b"{" + field_pad + b'"type": ' + dumps(node["type"])
+                + b"," + field_pad + b'"path": ' + dumps(node["path"])
+                + b"," + field_pad + b'"descripcion": ' + dumps(node["descripcion"])
+                + b"," + field_pad + b'"children": '
             )
-            node.children[name] = file_node
-            rich_parent.add(f"[green]{name}[/green]")
-    return node
+            children = node["children"]
+            if children:
+                write(b"{")
+                stack.append([iter(children.items()), level + 2, True])
+            else:
+                write(b"{}" + pad + b"}")
+        else:
+            write(dumps(node, option=indent_2).replace(b"\n", pad))
 
 
 # ---------- CLI ----------
@@ -170,29 +513,40 @@ def main(
         None, "--discard-files",
         help="Nombres de archivo a ignorar globalmente (separados por coma)"
     ),
+    cache_path: Optional[Path] = typer.Option(
+        None, "--cache-path",
+        help="Archivo de caché de package.json entre ejecuciones (p. ej. .scan_cache.json)"
+    ),
 ) -> None:
     root = project_path.resolve()
     if not root.is_dir():
         console.print("[red]✖ La ruta indicada no es un directorio.[/red]")
         raise typer.Exit(1)
 
-    discard_files_in_set = _read_list_option(discard_files_in)
+    # Tupla: str.startswith la recorre en C en una sola llamada
+    discard_files_in_prefixes = tuple(sorted(_read_list_option(discard_files_in)))
     discard_all_in_set = _read_list_option(discard_all_in)
     discard_files_set = _read_list_option(discard_files)
 
+    # Se lee de la caché anterior pero solo se guarda lo visto en esta
+    # ejecución (maps[0]): así no se acumulan archivos borrados o de otras raíces.
+    package_cache = ChainMap({}, _load_package_cache(cache_path))
+
     console.print(f"[bold]Explorando:[/bold] {root}")
-    rich_tree = Tree(f"[bold bright_white]{root.name}/") if pretty else Tree("")
     structure = {root.name: build_tree(
-        root, root, set(ignore),
-        discard_files_in_set, discard_all_in_set, discard_files_set,
-        rich_tree
+        str(root), _interned_set(ignore),
+        discard_files_in_prefixes, discard_all_in_set, discard_files_set,
+        package_cache
     )}
 
+    # El árbol Rich se arma una sola vez y solo si alguna salida lo usa
+    rich_tree = build_rich_tree(structure[root.name], root.name) if pretty or tree_md else None
+
     if pretty:
         console.print(rich_tree)
 
     if tree_md:
-        plain_text = render_tree_plain(structure[root.name], root.name)
+        plain_text = render_tree_plain(rich_tree, root.name)
         Path(tree_md).write_text(
             f"# Árbol del proyecto\n\n```\n{plain_text}\n```\n",
             encoding="utf-8"
@@ -200,12 +554,13 @@ def main(
         console.print(f"[bold green]✅ Árbol guardado en {tree_md}[/bold green]")
 
     out_path = Path(output)
-    out_path.write_text(
-        json.dumps(structure, indent=2, ensure_ascii=False, default=dict),
-        encoding="utf-8"
-    )
+    with out_path.open("wb", buffering=1 << 20) as fp:
+        write_structure_json(fp, structure)
     console.print(f"[bold green]✅ JSON guardado en {out_path.absolute()}[/bold green]")
 
+    if cache_path is not None:
+        _save_package_cache(cache_path, package_cache.maps[0])
+
 
 if __name__ == "__main__":
     app()
\ No newline at end of file